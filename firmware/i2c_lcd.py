@@ -1,18 +1,19 @@
 """Implements a HD44780 character LCD connected via PCF8574 on I2C."""
 
 from lcd_api import LcdApi
+from micropython import const
 import time
 
 # The PCF8574 has a jumper selectable address: 0x20 - 0x27 or 0x38 - 0x3F
-DEFAULT_I2C_ADDR = 0x27
+DEFAULT_I2C_ADDR = const(0x27)
 
 # Defines shifts or masks for the various LCD line attached to the PCF8574
 
-MASK_RS = 0x01
-MASK_RW = 0x02
-MASK_E = 0x04
-SHIFT_BACKLIGHT = 3
-SHIFT_DATA = 4
+MASK_RS = const(0x01)
+MASK_RW = const(0x02)
+MASK_E = const(0x04)
+SHIFT_BACKLIGHT = const(3)
+SHIFT_DATA = const(4)
 
 
 class I2cLcd(LcdApi):
@@ -21,6 +22,9 @@ class I2cLcd(LcdApi):
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
+        # Each LCD byte takes 4 PCF8574 states (2 nibbles, each with an E pulse)
+        self.write_buf = bytearray(4)
+        self.block_buf = bytearray(4 * 40)
         self.i2c.try_lock()
         # Send reset 3 times
         self.hal_write_init_nibble(self.LCD_FUNCTION_RESET)
@@ -45,8 +49,7 @@ class I2cLcd(LcdApi):
         This particular function is only used during initialization.
         """
         byte = ((nibble >> 4) & 0x0f) << SHIFT_DATA
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E, byte]))
 
     def hal_backlight_on(self):
         """Allows the hal layer to turn the backlight on."""
@@ -66,12 +69,7 @@ class I2cLcd(LcdApi):
         Data is latched on the falling edge of E.
         """
         self.i2c.try_lock()
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self.write_byte(cmd, 0)
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             time.sleep(0.005)
@@ -80,10 +78,49 @@ class I2cLcd(LcdApi):
     def hal_write_data(self, data):
         """Write data to the LCD."""
         self.i2c.try_lock()
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self.write_byte(data, MASK_RS)
         self.i2c.unlock()
+
+    def hal_write_command_data(self, cmd, data, start, end):
+        """Write a command followed by data[start:end] to the LCD,
+        sharing the I2C transfers.
+
+        Only for commands that need no extra delay, like setting the
+        display RAM address.
+        """
+        self.write_block(cmd, data, start, end)
+
+    def write_block(self, cmd, data, start, end):
+        """Writes a command and then data[start:end], filling each I2C
+        transfer as far as the block buffer allows.
+        """
+        self.i2c.try_lock()
+        buf = self.block_buf
+        self.encode_byte(buf, 0, cmd, 0)
+        pos = 4
+        for i in range(start, end):
+            self.encode_byte(buf, pos, data[i], MASK_RS)
+            pos += 4
+            if pos == len(buf):
+                self.i2c.writeto(self.i2c_addr, buf)
+                pos = 0
+        if pos:
+            self.i2c.writeto(self.i2c_addr, buf, end=pos)
+        self.i2c.unlock()
+
+    def write_byte(self, data, mask_rs):
+        """Writes a byte to the LCD as two nibbles in a single I2C transfer."""
+        self.encode_byte(self.write_buf, 0, data, mask_rs)
+        self.i2c.writeto(self.i2c_addr, self.write_buf)
+
+    def encode_byte(self, buf, pos, data, mask_rs):
+        """Encodes a byte as the 4 PCF8574 states needed to send it.
+
+        The PCF8574 outputs each byte as it arrives, so E is strobed by
+        sending every nibble twice: once with E set and once with E clear.
+        """
+        byte = mask_rs | (self.backlight << SHIFT_BACKLIGHT)
+        buf[pos + 1] = byte | (((data >> 4) & 0x0f) << SHIFT_DATA)
+        buf[pos] = buf[pos + 1] | MASK_E
+        buf[pos + 3] = byte | ((data & 0x0f) << SHIFT_DATA)
+        buf[pos + 2] = buf[pos + 3] | MASK_E
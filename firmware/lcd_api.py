@@ -125,12 +125,16 @@ class LcdApi:
         """
         self.cursor_x = cursor_x
         self.cursor_y = cursor_y
+        self.hal_write_command(self.LCD_DDRAM | self.ddram_addr(cursor_x, cursor_y))
+
+    def ddram_addr(self, cursor_x, cursor_y):
+        """Returns the display RAM address of the indicated position."""
         addr = cursor_x & 0x3f
         if cursor_y & 1:
             addr += 0x40    # Lines 1 & 3 add 0x40
         if cursor_y & 2:    # Lines 2 & 3 add number of columns
             addr += self.num_columns
-        self.hal_write_command(self.LCD_DDRAM | addr)
+        return addr
 
     def putchar(self, char):
         """Writes the indicated character to the LCD at the current cursor
@@ -161,6 +165,20 @@ class LcdApi:
         for char in string:
             self.putchar(char)
 
+    def putbytes_at(self, cursor_x, cursor_y, data, start=0, end=None):
+        """Moves the cursor to the indicated position and writes
+        data[start:end] there. Unlike putstr, no newline or wraparound
+        handling is done; the LCD advances its own cursor after each
+        character. The hal can send the move and the bytes together, and
+        no slice of data needs to be made.
+        """
+        if end is None:
+            end = len(data)
+        self.cursor_x = cursor_x + end - start
+        self.cursor_y = cursor_y
+        self.hal_write_command_data(self.LCD_DDRAM | self.ddram_addr(cursor_x, cursor_y),
+                                    data, start, end)
+
     def custom_char(self, location, charmap):
         """Write a character to one of the 8 CGRAM locations, available
         as chr(0) through chr(7).
@@ -203,6 +221,16 @@ class LcdApi:
         """
         raise NotImplementedError
 
+    def hal_write_command_data(self, cmd, data, start, end):
+        """Write a command followed by data[start:end] to the LCD.
+
+        A derived HAL class may override this to send the command and the
+        bytes in a single transfer.
+        """
+        self.hal_write_command(cmd)
+        for i in range(start, end):
+            self.hal_write_data(data[i])
+
     def hal_sleep_us(self, usecs):
         """Sleep for some time (given in microseconds)."""
         time.sleep(usecs / 1000000)
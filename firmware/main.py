@@ -12,6 +12,7 @@ import busio
 import time
 import usb_cdc
 import supervisor
+from micropython import const
 
 # Try to import LCD libraries
 try:
@@ -22,55 +23,343 @@ except ImportError:
     LCD_AVAILABLE = False
     print("LCD libraries not found - running in console mode")
 
-# Configuration
-I2C_ADDR = 0x27  # Common I2C address (try 0x3F if this doesn't work)
-I2C_NUM_ROWS = 2
-I2C_NUM_COLS = 16
+# Configuration (integer settings are const() so they compile to literals)
+I2C_ADDR = const(0x27)  # Common I2C address (try 0x3F if this doesn't work)
+I2C_NUM_ROWS = const(2)
+I2C_NUM_COLS = const(16)
 I2C_SDA = board.GP4
 I2C_SCL = board.GP5
+# Bus speeds to try in order, the first one the I2C peripheral accepts is used.
+# Don't add faster ones: characters are written back to back with no delays,
+# relying on each I2C byte (~22 us at 400 kHz) being slow enough that the two
+# between LCD writes cover the HD44780's ~41 us per instruction. The PCF8574
+# itself is only specified for 100 kHz, though most backpacks run at 400 kHz.
+I2C_FREQUENCIES = (400000, 100000)
+I2C_LOCK_TIMEOUT_MS = const(100)  # Give up on the bus if it stays locked this long
 
-EXPECTED_REFRESH_INTERVAL = 15  # Host sends data every 15 seconds
+EXPECTED_REFRESH_INTERVAL = const(15)  # Host sends data every 15 seconds
+EXPECTED_REFRESH_INTERVAL_MS = const(EXPECTED_REFRESH_INTERVAL * 1000)
+MAX_LINE_LENGTH = const(128)  # Drop buffered serial data with no newline past this
+ERROR_BACKOFF_MIN_MS = const(10)  # First delay after a main loop error
+ERROR_BACKOFF_MAX_MS = const(500)  # Repeated errors double the delay up to this
+COUNTDOWN_PRINT_INTERVAL_MS = const(5000)  # Console mode prints the countdown this often
 
-class USBIPDisplay:
+# supervisor.ticks_ms() counts milliseconds and wraps around at TICKS_PERIOD
+TICKS_PERIOD = const(1 << 29)
+TICKS_MAX = const(TICKS_PERIOD - 1)
+TICKS_HALFPERIOD = const(TICKS_PERIOD // 2)
+
+# Fixed LCD text, kept as bytes so it can be copied straight into a row buffer
+STARTUP_LINE1 = b"USB IP Display"
+STARTUP_LINE2 = b"Connecting..."
+WAITING_LINE = b"Waiting for host"
+UPTIME_PREFIX = b"Uptime: "
+SSH_UNKNOWN = b"SSH: ???"
+COUNTDOWN_SSH_WIDTH = const(8)  # Columns of SSH status shown before the countdown
+MAX_WRITE_THROUGH = const(2)  # Unchanged cells rewritten rather than skipped with a cursor move
+SECONDS_SUFFIX = b"s"
+SHUTDOWN_LINE = b"Shutting down..."
+
+# Countdown text for every value it can show, indexed by seconds left
+COUNTDOWN_TEXT = tuple(f" R:{seconds}s".encode() for seconds in range(EXPECTED_REFRESH_INTERVAL))
+
+def fill(buf, col, text, end=None):
+    """Copy text into buf starting at col, returns the column after it
+
+    Copying stops at column end (or the end of buf), so long text is cut
+    off without slicing it first.
+    """
+    if end is None:
+        end = len(buf)
+    for byte in text:
+        if col >= end:
+            break
+        buf[col] = byte
+        col += 1
+    return col
+
+def ticks_add(ticks, delta):
+    """Add delta milliseconds to a ticks_ms() value"""
+    return (ticks + delta) & TICKS_MAX
+
+def ticks_diff(ticks1, ticks2):
+    """Return the milliseconds from ticks2 to ticks1, allowing for wraparound"""
+    diff = (ticks1 - ticks2) & TICKS_MAX
+    return ((diff + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+def fill_int(buf, col, value):
+    """Write a non-negative integer into buf at col, returns the column after it"""
+    divisor = 1
+    while divisor * 10 <= value:
+        divisor *= 10
+    while divisor and col < len(buf):
+        buf[col] = 0x30 + (value // divisor) % 10
+        divisor //= 10
+        col += 1
+    return col
+
+class SerialReceiver:
+    """Receives IP and SSH status lines from the host over USB serial"""
+    
     def __init__(self):
-        """Initialize the display and serial connection"""
-        self.lcd = None
         self.serial = None
         self.last_ip = None
         self.last_ssh = None
         self.last_receive_time = None
+        
+        # Received bytes that don't form a complete line yet
+        self._rx_buf = b""
+        
+        self.init_serial()
+    
+    def init_serial(self):
+        """Initialize USB serial connection"""
+        try:
+            self.serial = usb_cdc.console
+            if self.serial:
+                self.serial.timeout = 0.1
+                print("Serial initialized")
+            else:
+                print("No serial connection available")
+        except Exception as e:
+            print(f"Serial initialization error: {e}")
+            self.serial = None
+    
+    def read_serial(self, timeout_ms):
+        """Wait up to timeout_ms for serial data and return what arrived
+        
+        Blocks in the CDC read rather than polling in_waiting, so the main loop
+        only wakes up when the host sends something or the timeout expires.
+        """
+        timeout = max(0, timeout_ms) / 1000
+        serial = self.serial
+        if not serial:
+            time.sleep(timeout)
+            return b""
+        serial.timeout = timeout
+        data = serial.read(1)
+        if data:
+            waiting = serial.in_waiting
+            if waiting:
+                data += serial.read(waiting)
+        return data
+    
+    def wait_after_error(self, delay_ms):
+        """Wait out an error delay while still taking in serial data
+        
+        Keeps the CDC buffer drained during error recovery, so the host's
+        writes don't back up while the loop is backing off.
+        """
+        try:
+            self.receive(self.read_serial(delay_ms), supervisor.ticks_ms())
+        except Exception:
+            # Serial itself is failing, just wait
+            time.sleep(delay_ms / 1000)
+    
+    def receive_age(self, now):
+        """Return the milliseconds since data was last received
+        
+        Returns None if nothing was received within the refresh interval.
+        The receive time is forgotten once it is that old, so the tick
+        counter wrapping around can't make stale data look recent.
+        """
+        if self.last_receive_time is None:
+            return None
+        age = ticks_diff(now, self.last_receive_time)
+        if age >= EXPECTED_REFRESH_INTERVAL_MS:
+            self.last_receive_time = None
+            return None
+        return age
+    
+    def handle_line(self, line, now):
+        """Store the data from one received line, returns True if it had any"""
+        # Skip surrounding whitespace (and the CR of a CRLF ending) by index,
+        # so blank lines are dropped without making a copy
+        start = 0
+        end = len(line)
+        while start < end and line[start] <= 0x20:
+            start += 1
+        while end > start and line[end - 1] <= 0x20:
+            end -= 1
+        if start == end:
+            return False
+        
+        # The data is kept as bytes, so only accept text the LCD can show.
+        # The same pass finds the IP|SSH separator
+        separator = -1
+        for i in range(start, end):
+            byte = line[i]
+            if byte > 0x7e:
+                print("Ignoring non-ASCII data")
+                return False
+            if byte == 0x7c and separator < 0:  # b'|'
+                separator = i
+        
+        if separator < 0:
+            # Assume it's just an IP
+            ip = line[start:end]
+            ssh = SSH_UNKNOWN
+        else:
+            ip = line[start:separator]
+            ssh = line[separator + 1:end]
+        if not ip:
+            return False
+        
+        # Update stored data
+        self.last_ip = ip
+        self.last_ssh = ssh
+        self.last_receive_time = now
+        return True
+    
+    def receive(self, data, now):
+        """Handle newly read serial data, returns True if new data was stored
+        
+        The host sends printable ASCII lines of the form IP|SSH ending in a
+        newline. The protocol is kept as text on purpose: the data arrives on
+        the console CDC channel, where CircuitPython acts on control bytes
+        like Ctrl-C and Ctrl-D itself, so binary length prefixes could
+        interrupt or reload the firmware. Newlines also resynchronise after
+        any lost byte, which a length prefix wouldn't.
+        """
+        self._rx_buf += data
+        updated = False
+        
+        # Handle each complete line, a partial one stays buffered
+        end = self._rx_buf.find(b'\n')
+        while end >= 0:
+            line = self._rx_buf[:end]
+            self._rx_buf = self._rx_buf[end + 1:]
+            if self.handle_line(line, now):
+                updated = True
+            end = self._rx_buf.find(b'\n')
+        
+        if len(self._rx_buf) > MAX_LINE_LENGTH:
+            print("Discarding unterminated data")
+            self._rx_buf = b""
+        
+        return updated
+    
+    def on_update(self, now):
+        """Called after new data was received and stored"""
+        pass
+    
+    def on_tick(self, now):
+        """Called on every pass of the main loop, at least by next_tick_time"""
+        pass
+    
+    def next_tick_time(self, now):
+        """Return the ticks when on_tick next needs to run, by default on
+        the next whole second
+        """
+        return ticks_add(now, 1000 - now % 1000)
+    
+    def on_shutdown(self):
+        """Called when the main loop is interrupted"""
+        pass
+    
+    def run(self):
+        """Main loop, shared by the display and console front ends"""
+        # Bind the methods used every iteration to locals, so the loop
+        # doesn't repeat the attribute lookups. Loop timing uses ticks_ms(),
+        # which stays exact where a float from time.monotonic() would lose
+        # precision after a long uptime
+        ticks_ms = supervisor.ticks_ms
+        read_serial = self.read_serial
+        receive = self.receive
+        on_update = self.on_update
+        on_tick = self.on_tick
+        next_tick_time = self.next_tick_time
+        
+        # The first tick waits too, so a startup screen stays up until then
+        next_tick = next_tick_time(ticks_ms())
+        backoff = ERROR_BACKOFF_MIN_MS
+        
+        while True:
+            try:
+                # Sleep until serial data arrives or the next tick is due,
+                # measured from now so time spent in on_tick isn't waited again
+                raw_data = read_serial(ticks_diff(next_tick, ticks_ms()))
+                now = ticks_ms()
+                
+                if raw_data and receive(raw_data, now):
+                    on_update(now)
+                
+                on_tick(now)
+                next_tick = next_tick_time(now)
+                backoff = ERROR_BACKOFF_MIN_MS
+                
+            except KeyboardInterrupt:
+                print("\nShutting down...")
+                self.on_shutdown()
+                break
+                
+            except Exception as e:
+                print(f"Main loop error: {e}")
+                self.wait_after_error(backoff)
+                backoff = min(backoff * 2, ERROR_BACKOFF_MAX_MS)
+
+class USBIPDisplay(SerialReceiver):
+    def __init__(self):
+        """Initialize the display and serial connection"""
+        self.lcd = None
         self.startup_time = time.monotonic()
         
+        # Row being composed, and the text currently shown on each LCD row
+        self._line = bytearray(I2C_NUM_COLS)
+        self._rendered = [bytearray(b" " * I2C_NUM_COLS) for _ in range(I2C_NUM_ROWS)]
+        
+        # Data and seconds the current screen was drawn from, kept as separate
+        # attributes so checking them doesn't build a tuple on every wakeup
+        self._drawn_ip = None
+        self._drawn_ssh = None
+        self._drawn_seconds = None
+        
         # Initialize components
         if LCD_AVAILABLE:
             self.init_lcd()
-        self.init_serial()
-        
+        super().__init__()
+    
     def init_lcd(self):
         """Initialize the I2C LCD display"""
         try:
-            # Create I2C bus
-            i2c = busio.I2C(I2C_SCL, I2C_SDA, frequency=100000)
-            
-            # Wait for I2C to be ready
-            while not i2c.try_lock():
-                pass
-            
-            # Scan for I2C devices
-            devices = i2c.scan()
-            i2c.unlock()
-            
-            if devices:
-                print(f"I2C devices found: {[hex(d) for d in devices]}")
-                # Use first device found if our address isn't there
-                actual_addr = I2C_ADDR if I2C_ADDR in devices else devices[0]
+            # Create I2C bus at the fastest frequency that is accepted
+            for frequency in I2C_FREQUENCIES:
+                try:
+                    i2c = busio.I2C(I2C_SCL, I2C_SDA, frequency=frequency)
+                    break
+                except ValueError:
+                    print(f"I2C at {frequency} Hz not supported")
             else:
-                print("No I2C devices found, using default")
-                actual_addr = I2C_ADDR
+                raise RuntimeError("No supported I2C frequency")
             
-            # Initialize LCD
-            self.lcd = I2cLcd(i2c, actual_addr, I2C_NUM_ROWS, I2C_NUM_COLS)
-            self.lcd.clear()
+            # Initialize LCD (which also clears it) at the configured address,
+            # only scanning the bus if nothing answers there
+            try:
+                self.lcd = I2cLcd(i2c, I2C_ADDR, I2C_NUM_ROWS, I2C_NUM_COLS)
+            except OSError:
+                # The failed write leaves the bus locked
+                i2c.unlock()
+                print(f"No LCD at {hex(I2C_ADDR)}, scanning I2C bus")
+                
+                # Wait up to I2C_LOCK_TIMEOUT_MS for I2C to be ready
+                deadline = ticks_add(supervisor.ticks_ms(), I2C_LOCK_TIMEOUT_MS)
+                while not i2c.try_lock():
+                    if ticks_diff(deadline, supervisor.ticks_ms()) <= 0:
+                        raise RuntimeError("I2C bus busy")
+                    time.sleep(0.001)
+                
+                # Scan for I2C devices, always releasing the bus afterwards
+                try:
+                    devices = i2c.scan()
+                finally:
+                    i2c.unlock()
+                
+                if not devices:
+                    print("No I2C devices found")
+                    raise
+                
+                print(f"I2C devices found: {[hex(d) for d in devices]}")
+                self.lcd = I2cLcd(i2c, devices[0], I2C_NUM_ROWS, I2C_NUM_COLS)
             
             # Show startup message
             self.show_startup()
@@ -81,209 +370,179 @@ class USBIPDisplay:
             print(f"LCD initialization error: {e}")
             self.lcd = None
     
-    def init_serial(self):
-        """Initialize USB serial connection"""
+    def show_line(self, row, end):
+        """Show the composed row buffer, only sending the characters that changed
+
+        Everything in the row buffer from end onwards is blanked first.
+        """
+        line = self._line
+        for col in range(end, I2C_NUM_COLS):
+            line[col] = 0x20
+        
+        # Write each run of cells that differ from what is on screen. Short
+        # gaps are written through, a cursor move costs about as much as
+        # rewriting a couple of cells
+        shown = self._rendered[row]
+        col = 0
+        while col < I2C_NUM_COLS:
+            if line[col] == shown[col]:
+                col += 1
+                continue
+            first = last = col
+            col += 1
+            while col < I2C_NUM_COLS and col - last <= MAX_WRITE_THROUGH + 1:
+                if line[col] != shown[col]:
+                    last = col
+                col += 1
+            
+            try:
+                self.write_span(row, first, last + 1)
+            except OSError:
+                # What these cells show is unknown now, redraw them next time
+                for changed in range(first, last + 1):
+                    shown[changed] = 0
+                raise
+            for changed in range(first, last + 1):
+                shown[changed] = line[changed]
+            col = last + 1
+    
+    def write_span(self, row, start, end):
+        """Write the row buffer's cells start to end to the LCD
+        
+        An I2C error is retried once, a NACK from the backpack is usually
+        transient. A second error is left to the main loop to report.
+        """
         try:
-            self.serial = usb_cdc.console
-            if self.serial:
-                self.serial.timeout = 0.1
-                print("Serial initialized")
-            else:
-                print("No serial connection available")
-        except Exception as e:
-            print(f"Serial initialization error: {e}")
-            self.serial = None
+            self.lcd.putbytes_at(start, row, self._line, start, end)
+        except OSError:
+            time.sleep(0.001)
+            self.lcd.putbytes_at(start, row, self._line, start, end)
+    
+    def write_line(self, row, text):
+        """Write a line of text to the LCD"""
+        self.show_line(row, fill(self._line, 0, text))
     
     def show_startup(self):
         """Show startup message"""
         if self.lcd:
-            self.lcd.clear()
-            self.lcd.putstr("USB IP Display")
-            self.lcd.move_to(0, 1)
-            self.lcd.putstr("Connecting...")
+            self.write_line(0, STARTUP_LINE1)
+            self.write_line(1, STARTUP_LINE2)
     
-    def update_display(self):
+    def update_display(self, now):
         """Update the display with current data and countdown"""
         if not self.lcd:
             return
         
-        try:
-            self.lcd.clear()
-            
-            # If we have never received data
-            if self.last_ip is None:
-                self.lcd.putstr("Waiting for host")
-                self.lcd.move_to(0, 1)
-                uptime = int(time.monotonic() - self.startup_time)
-                self.lcd.putstr(f"Uptime: {uptime}s")
-                return
-            
+        # Work out the seconds to show: uptime while waiting for the host,
+        # otherwise the refresh countdown (-1 once it has run out)
+        if self.last_ip is None:
+            seconds = int(time.monotonic() - self.startup_time)
+        else:
+            seconds = -1
+            age = self.receive_age(now)
+            if age is not None:
+                # Whole seconds left, ticking over on whole seconds elapsed
+                seconds = EXPECTED_REFRESH_INTERVAL - 1 - age // 1000
+        
+        # Nothing to redraw if the screen would look the same
+        if (seconds == self._drawn_seconds and self.last_ip == self._drawn_ip and
+                self.last_ssh == self._drawn_ssh):
+            return
+        
+        line = self._line
+        
+        # Line 1 only changes with the IP (or the first time a frame is drawn),
+        # so most frames skip copying and comparing it
+        new_ip = self._drawn_seconds is None or self.last_ip != self._drawn_ip
+        
+        # If we have never received data
+        if self.last_ip is None:
+            if new_ip:
+                self.write_line(0, WAITING_LINE)
+            col = fill(line, 0, UPTIME_PREFIX)
+            col = fill_int(line, col, seconds)
+            self.show_line(1, fill(line, col, SECONDS_SUFFIX))
+        else:
             # Display IP on line 1
-            self.lcd.putstr(self.last_ip[:16])
+            if new_ip:
+                self.write_line(0, self.last_ip)
             
-            # Calculate countdown for line 2
-            if self.last_receive_time:
-                elapsed = time.monotonic() - self.last_receive_time
-                time_until_refresh = max(0, EXPECTED_REFRESH_INTERVAL - elapsed)
-                
-                # Format line 2 with SSH status and countdown
-                if time_until_refresh > 0:
-                    ssh_display = self.last_ssh[:8] if self.last_ssh else "SSH: ???"
-                    countdown = f" R:{int(time_until_refresh)}s"
-                    line2 = (ssh_display + countdown)[:16]
-                else:
-                    # Show just SSH status when refresh is imminent
-                    line2 = (self.last_ssh or "SSH: ???")[:16]
+            # Line 2 shows the SSH status, plus a countdown while one is running
+            if seconds >= 0:
+                col = fill(line, 0, self.last_ssh or SSH_UNKNOWN, COUNTDOWN_SSH_WIDTH)
+                col = fill(line, col, COUNTDOWN_TEXT[seconds])
             else:
-                # No timing info yet
-                line2 = (self.last_ssh or "SSH: ???")[:16]
-            
-            self.lcd.move_to(0, 1)
-            self.lcd.putstr(line2)
+                # Show just SSH status when refresh is imminent
+                col = fill(line, 0, self.last_ssh or SSH_UNKNOWN)
             
-        except Exception as e:
-            print(f"Display error: {e}")
+            self.show_line(1, col)
+        
+        self._drawn_ip = self.last_ip
+        self._drawn_ssh = self.last_ssh
+        self._drawn_seconds = seconds
     
-    def parse_data(self, data):
-        """Parse incoming data"""
-        try:
-            data = data.strip()
-            
-            if '|' in data:
-                parts = data.split('|', 1)
-                return parts[0], parts[1] if len(parts) > 1 else ""
-            else:
-                # Assume it's just an IP
-                return data, "SSH: ???"
-                
-        except Exception as e:
-            print(f"Parse error: {e}")
-            return None, None
+    def next_tick_time(self, now):
+        """Return the ticks when the uptime or countdown on screen next changes"""
+        if self.last_ip is None:
+            # Uptime is counted with time.monotonic(), so it doesn't wrap
+            uptime_ms = int((time.monotonic() - self.startup_time) * 1000)
+            return ticks_add(now, 1000 - uptime_ms % 1000)
+        age = self.receive_age(now)
+        if age is None:
+            # Countdown has run out, nothing changes until the host sends data
+            return ticks_add(now, EXPECTED_REFRESH_INTERVAL_MS)
+        return ticks_add(now, 1000 - age % 1000)
+    
+    def on_update(self, now):
+        """Report newly received data"""
+        print(f"Received: IP={self.last_ip.decode()}, SSH={self.last_ssh.decode()}")
+    
+    def on_tick(self, now):
+        """Redraw the display, only when the data or the shown seconds changed"""
+        self.update_display(now)
+    
+    def on_shutdown(self):
+        """Leave a shutdown message on the display"""
+        if self.lcd:
+            self.write_line(0, SHUTDOWN_LINE)
+            self.show_line(1, 0)
     
     def run(self):
         """Main loop"""
         print("Starting USB IP Display (Simple Robust Version)...")
-        
-        last_display_update = time.monotonic()
-        display_update_interval = 0.5  # Update display every 0.5 seconds
-        
-        while True:
-            try:
-                current_time = time.monotonic()
-                
-                # Check for serial data
-                if self.serial and self.serial.in_waiting > 0:
-                    try:
-                        raw_data = self.serial.read(self.serial.in_waiting)
-                        
-                        if raw_data:
-                            data_str = raw_data.decode('utf-8')
-                            
-                            # Process each line
-                            for line in data_str.split('\n'):
-                                line = line.strip()
-                                if line:
-                                    ip, ssh = self.parse_data(line)
-                                    
-                                    if ip:
-                                        print(f"Received: IP={ip}, SSH={ssh}")
-                                        
-                                        # Update stored data
-                                        self.last_ip = ip
-                                        self.last_ssh = ssh
-                                        self.last_receive_time = current_time
-                                        
-                                        # Immediately update display
-                                        self.update_display()
-                                        last_display_update = current_time
-                                        
-                    except UnicodeDecodeError:
-                        print("Decode error")
-                    except Exception as e:
-                        print(f"Data processing error: {e}")
-                
-                # Update display periodically (for countdown)
-                if current_time - last_display_update >= display_update_interval:
-                    self.update_display()
-                    last_display_update = current_time
-                
-                # Small delay
-                time.sleep(0.01)
-                
-            except KeyboardInterrupt:
-                print("\nShutting down...")
-                if self.lcd:
-                    self.lcd.clear()
-                    self.lcd.putstr("Shutting down...")
-                break
-                
-            except Exception as e:
-                print(f"Main loop error: {e}")
-                time.sleep(0.5)
+        super().run()
 
-class SimpleConsoleReceiver:
+class SimpleConsoleReceiver(SerialReceiver):
     """Console-only version for testing"""
     
-    def __init__(self):
-        self.serial = usb_cdc.console
-        if self.serial:
-            self.serial.timeout = 0.1
-        self.last_ip = None
-        self.last_ssh = None
-        self.last_receive_time = None
+    def on_update(self, now):
+        """Print the data that was just received"""
+        # Calculate time until next expected update
+        countdown = EXPECTED_REFRESH_INTERVAL
+        
+        print(f"\n[{now // 1000}s] Received:")
+        print(f"  IP:  {self.last_ip.decode()}")
+        print(f"  SSH: {self.last_ssh.decode()}")
+        print(f"  Next refresh expected in {countdown}s")
+        print("-" * 40)
+    
+    def on_tick(self, now):
+        """Print the countdown every COUNTDOWN_PRINT_INTERVAL_MS"""
+        if now % COUNTDOWN_PRINT_INTERVAL_MS < 1000:
+            age = self.receive_age(now)
+            if age is not None:
+                remaining = (EXPECTED_REFRESH_INTERVAL_MS - age) // 1000
+                print(f"Next refresh in {remaining}s...", end='\r')
+    
+    def next_tick_time(self, now):
+        """Only wake up for the next countdown print, not every second"""
+        return ticks_add(now, COUNTDOWN_PRINT_INTERVAL_MS - now % COUNTDOWN_PRINT_INTERVAL_MS)
     
     def run(self):
         print("Simple Console Receiver (No LCD)")
         print("Waiting for data from host...")
         print("-" * 40)
-        
-        while True:
-            try:
-                current_time = time.monotonic()
-                
-                if self.serial and self.serial.in_waiting > 0:
-                    raw_data = self.serial.read(self.serial.in_waiting)
-                    if raw_data:
-                        try:
-                            data_str = raw_data.decode('utf-8').strip()
-                            if data_str:
-                                if '|' in data_str:
-                                    parts = data_str.split('|')
-                                    self.last_ip = parts[0]
-                                    self.last_ssh = parts[1] if len(parts) > 1 else ""
-                                else:
-                                    self.last_ip = data_str
-                                    self.last_ssh = "???"
-                                
-                                self.last_receive_time = current_time
-                                
-                                # Calculate time until next expected update
-                                countdown = EXPECTED_REFRESH_INTERVAL
-                                
-                                print(f"\n[{int(current_time)}s] Received:")
-                                print(f"  IP:  {self.last_ip}")
-                                print(f"  SSH: {self.last_ssh}")
-                                print(f"  Next refresh expected in {countdown}s")
-                                print("-" * 40)
-                                
-                        except UnicodeDecodeError:
-                            print("Decode error")
-                
-                # Print countdown periodically
-                if self.last_receive_time and int(current_time) % 5 == 0:
-                    elapsed = current_time - self.last_receive_time
-                    remaining = max(0, EXPECTED_REFRESH_INTERVAL - elapsed)
-                    if remaining > 0:
-                        print(f"Next refresh in {int(remaining)}s...", end='\r')
-                
-                time.sleep(0.1)
-                
-            except KeyboardInterrupt:
-                print("\nShutting down...")
-                break
-            except Exception as e:
-                print(f"Error: {e}")
-                time.sleep(0.5)
+        super().run()
 
 # Main execution
 if __name__ == "__main__":
@@ -62,15 +62,34 @@ if ! python3 -c "import serial" 2>/dev/null; then
     { print_msg "Warning: Could not install pyserial automatically" "$YELLOW"; }
 fi
 
+# pyudev is optional, without it the sender polls for the device
+if ! python3 -c "import pyudev" 2>/dev/null; then
+    apt-get install -y python3-pyudev 2>/dev/null || \
+    pip3 install pyudev --break-system-packages 2>/dev/null || \
+    pip3 install pyudev 2>/dev/null || \
+    { print_msg "Note: pyudev not installed, device detection will poll" "$YELLOW"; }
+fi
+
 print_msg "✓ Dependencies installed" "$GREEN"
 
 # 3. Find Python3 location (for systemd)
 PYTHON_PATH=$(which python3)
 print_msg "Python3 location: $PYTHON_PATH" "$NC"
 
-# 4. Create the sender script directly (embedded)
+# 4. Install the sender script, from the checkout when run from one,
+#    otherwise from the copy embedded below (for curl | bash installs)
 print_msg "Installing sender script..." "$YELLOW"
 
+SCRIPT_DIR=""
+if [ -n "${BASH_SOURCE[0]}" ] && [ -f "${BASH_SOURCE[0]}" ]; then
+    SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+fi
+
+if [ -n "$SCRIPT_DIR" ] && [ -f "$SCRIPT_DIR/usb_ip_sender.py" ]; then
+    # Strip CRLF line endings, the shebang line can't have them
+    tr -d '\r' < "$SCRIPT_DIR/usb_ip_sender.py" > /usr/local/bin/usb_ip_sender.py
+else
+# Copy of usb_ip_sender.py, update it with python3 update_installer.py
 cat > /usr/local/bin/usb_ip_sender.py << 'PYTHON_SCRIPT_EOF'
 #!/usr/bin/env python3
 """
@@ -80,26 +99,71 @@ Features:
 - Resends every 15 seconds automatically
 - Handles disconnections gracefully
 - No need for Pico to request refreshes
+- Sends right away on SIGUSR1 or SIGHUP
 """
 
 import serial
 import serial.tools.list_ports
-import subprocess
+import fcntl
+import glob
+import socket
+import struct
 import time
 import sys
 import os
+import select
 import signal
+import logging
+import logging.handlers
 from datetime import datetime
 
+# Optional, lets wait_for_device sleep until a tty appears instead of polling
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
 # Configuration
 BAUD_RATE = 115200
 SEND_INTERVAL = 15  # Send data every 15 seconds
 INITIAL_DELAY = 2   # Wait this long after connection before first send
 RETRY_DELAY = 1     # Wait between connection attempts
+WRITE_TIMEOUT = 1   # Give up on a write the device doesn't accept in time
+MAX_FAILED_SENDS = 3  # Reopen the port after this many sends fail in a row
+SYSLOG_SOCKET = '/dev/log'
+PICO_HWID = 'VID:PID=2E8A'  # Raspberry Pi vendor ID in the port's hardware ID
+SSH_PORT = 22
+SSHD_PID_FILE = '/run/sshd.pid'
+
+ROUTE_PROBE_ADDRESS = '10.255.255.255'  # Any non-local address works
+SIOCGIFADDR = 0x8915  # ioctl to read an interface's IPv4 address
+TCP_LISTEN = '0A'     # Socket state in /proc/net/tcp for a listening socket
+RTMGRP_IPV4_IFADDR = 0x10  # Netlink group notified of IPv4 address changes
+RTMGRP_IPV4_ROUTE = 0x40   # Netlink group notified of IPv4 route changes
 
 # Global flag for clean shutdown
 running = True
 
+log = logging.getLogger('usb-ip-display')
+
+# Port the device was last found at
+last_port = None
+
+# Last data sent and its encoded form, reused while the data is unchanged
+last_data = None
+last_payload = b''
+
+def setup_logging():
+    """Log to syslog through one socket that stays open"""
+    log.setLevel(logging.INFO)
+    if not os.path.exists(SYSLOG_SOCKET):
+        print(f"Syslog unavailable, {SYSLOG_SOCKET} not found")
+        return
+    handler = logging.handlers.SysLogHandler(
+        address=SYSLOG_SOCKET, facility=logging.handlers.SysLogHandler.LOG_DAEMON)
+    handler.setFormatter(logging.Formatter('%(name)s[%(process)d]: %(message)s'))
+    log.addHandler(handler)
+
 def signal_handler(sig, frame):
     global running
     running = False
@@ -109,140 +173,245 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
+# Written to by refresh_handler, so a refresh wakes up the connection loop
+refresh_pipe = os.pipe()
+for fd in refresh_pipe:
+    os.set_blocking(fd, False)
+
+def refresh_handler(sig, frame):
+    """Ask the connection loop to look the data up again and send it now"""
+    try:
+        os.write(refresh_pipe[1], b'\0')
+    except BlockingIOError:
+        # Plenty of refreshes are pending already
+        pass
+
+def drain_refresh_requests():
+    """Read all pending refresh requests, returns True if there were any"""
+    requested = False
+    while True:
+        try:
+            os.read(refresh_pipe[0], 512)
+        except BlockingIOError:
+            return requested
+        requested = True
+
+# e.g. systemctl reload pico-monitor, or pkill -USR1 -f usb_ip_sender.py
+signal.signal(signal.SIGUSR1, refresh_handler)
+signal.signal(signal.SIGHUP, refresh_handler)
+
+def get_interface_ips():
+    """Get the IPv4 address of every network interface that has one"""
+    ips = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            try:
+                ifreq = fcntl.ioctl(sock.fileno(), SIOCGIFADDR,
+                                    struct.pack('256s', name[:15].encode()))
+            except OSError:
+                # Interface has no IPv4 address
+                continue
+            ips.append(socket.inet_ntoa(ifreq[20:24]))
+    return ips
+
+def get_route_ip():
+    """Get the IPv4 address the kernel would send outside traffic from
+    
+    Connecting a UDP socket only does a route lookup, no packets are sent.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((ROUTE_PROBE_ADDRESS, 1))
+        return sock.getsockname()[0]
+
 def get_ip_address():
     """Get the primary IP address"""
     try:
-        result = subprocess.run(['hostname', '-I'], capture_output=True, text=True, timeout=2)
-        ips = result.stdout.strip().split()
+        # The address of the default route is the one to show
+        try:
+            ip = get_route_ip()
+            if not ip.startswith('127.') and ip != '0.0.0.0':
+                return ip
+        except OSError:
+            # No route, look at the interfaces directly
+            pass
         
-        if ips:
-            # Get IPv4 addresses only
-            ipv4_ips = [ip for ip in ips if ':' not in ip and '.' in ip]
-            
-            # Prioritize non-localhost addresses
-            for ip in ipv4_ips:
-                if not ip.startswith('127.') and not ip.startswith('169.254.'):
-                    return ip
-            
-            # Fall back to any IPv4
-            if ipv4_ips:
-                return ipv4_ips[0]
-            
-            # Last resort - any IP
-            if ips:
-                return ips[0]
+        # Prioritize non-link-local addresses, falling back to the first
+        # link-local one, in a single pass
+        fallback = None
+        for ip in get_interface_ips():
+            if ip.startswith('127.'):
+                continue
+            if not ip.startswith('169.254.'):
+                return ip
+            if fallback is None:
+                fallback = ip
         
-        return "No IP found"
+        return fallback or "No IP found"
         
     except Exception as e:
         return "IP Error"
 
 def get_ssh_status():
-    """Check if SSH service is running"""
+    """Check if sshd is running or anything is listening on the SSH port"""
     try:
-        # Check systemd services
-        for service in ['ssh', 'sshd', 'openssh-server']:
+        # sshd writes its pid file when started as a daemon
+        if os.path.exists(SSHD_PID_FILE):
+            return "SSH: ON"
+        
+        # Socket activated or non-standard setups have no pid file
+        local_port = f":{SSH_PORT:04X}"
+        for path in ('/proc/net/tcp', '/proc/net/tcp6'):
             try:
-                result = subprocess.run(
-                    ['systemctl', 'is-active', service], 
-                    capture_output=True, 
-                    text=True,
-                    timeout=1
-                )
-                if result.returncode == 0 and result.stdout.strip() == 'active':
-                    return "SSH: ON"
-            except:
+                with open(path) as f:
+                    next(f)  # Skip the header
+                    for line in f:
+                        fields = line.split()
+                        if fields[1].endswith(local_port) and fields[3] == TCP_LISTEN:
+                            return "SSH: ON"
+            except FileNotFoundError:
+                # No IPv6 support
                 continue
         
-        # Check process
-        try:
-            result = subprocess.run(['pgrep', 'sshd'], capture_output=True, text=True, timeout=1)
-            if result.stdout.strip():
-                return "SSH: ON"
-        except:
-            pass
-        
         return "SSH: OFF"
         
     except Exception:
         return "SSH: ???"
 
+def open_address_monitor():
+    """Open a netlink socket that is notified whenever an IPv4 address or
+    route is added or removed, or return None if that isn't available
+    
+    Routes are watched too, since the IP shown is the default route's.
+    """
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        sock.bind((0, RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE))
+        sock.setblocking(False)
+        return sock
+    except (AttributeError, OSError) as e:
+        print(f"Address change monitoring unavailable: {e}")
+        return None
+
+def drain_address_events(monitor):
+    """Read all pending address and route change messages, returns True if
+    there were any"""
+    changed = False
+    while True:
+        try:
+            monitor.recv(65536)
+        except BlockingIOError:
+            return changed
+        changed = True
+
 def find_pico_port():
     """Find the Pico's serial port"""
-    # First, try common ports
+    # First, look for the Raspberry Pi vendor ID
+    try:
+        port = next(serial.tools.list_ports.grep(PICO_HWID), None)
+        if port:
+            return port.device
+    except Exception:
+        pass
+    
+    # Then try common ports
     common_ports = ['/dev/ttyACM0', '/dev/ttyACM1', '/dev/ttyUSB0']
     for port in common_ports:
         if os.path.exists(port):
             return port
     
-    # Try to find using serial.tools
-    try:
-        ports = serial.tools.list_ports.comports()
-        for port in ports:
-            # Check for Raspberry Pi vendor ID
-            if port.vid == 0x2e8a:
-                return port.device
-            # Check for common CDC ACM devices
-            if 'ACM' in port.device or 'USB' in port.device:
-                return port.device
-    except:
-        pass
-    
-    # Last resort - find any ttyACM device
-    import glob
-    acm_devices = glob.glob('/dev/ttyACM*')
-    if acm_devices:
-        return acm_devices[0]
+    # Last resort - find any ttyACM or ttyUSB device, lowest numbered first
+    devices = sorted(glob.glob('/dev/ttyACM*')) + sorted(glob.glob('/dev/ttyUSB*'))
+    if devices:
+        return devices[0]
     
     return None
 
+def open_tty_monitor():
+    """Start a udev monitor for tty devices, or return None without pyudev"""
+    if pyudev is None:
+        return None
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by('tty')
+        monitor.start()
+        return monitor
+    except Exception as e:
+        print(f"udev monitoring unavailable: {e}")
+        return None
+
 def wait_for_device():
     """Wait for Pico device to appear"""
+    global last_port
+    
+    # The port last used is usually where the device comes back
+    if last_port and os.path.exists(last_port):
+        return last_port
+    
     print("Waiting for Pico device...")
-    os.system('logger -t usb-ip-display "Waiting for device..."')
+    log.info("Waiting for device...")
+    
+    # Started before scanning, so a device added during the scan isn't missed
+    monitor = open_tty_monitor()
     
     while running:
         port = find_pico_port()
         if port:
             print(f"Found device at {port}")
-            os.system(f'logger -t usb-ip-display "Device found at {port}"')
+            log.info(f"Device found at {port}")
+            last_port = port
             return port
-        time.sleep(RETRY_DELAY)
+        if monitor:
+            # Sleep until a tty is added, then scan again
+            device = monitor.poll()
+            while device is not None and device.action != 'add':
+                device = monitor.poll()
+        else:
+            time.sleep(RETRY_DELAY)
     
     return None
 
-def send_data_to_pico(ser):
-    """Send IP and SSH data to Pico"""
+def get_display_data(ip=None):
+    """Get the data line for the Pico, looking the IP up unless it is given"""
+    ip = (ip or get_ip_address())[:16]
+    ssh = get_ssh_status()[:16]
+    return f"{ip}|{ssh}"
+
+def send_data_to_pico(ser, ip=None):
+    """Send IP and SSH data to Pico, looking the IP up unless it is given"""
+    global last_data, last_payload
+    
     try:
-        ip = get_ip_address()[:16]
-        ssh = get_ssh_status()[:16]
-        data = f"{ip}|{ssh}"
+        data = get_display_data(ip)
+        
+        if data != last_data:
+            # The leading newline ends any partial line the Pico still has
+            # buffered so this line always arrives whole. The firmware only
+            # accepts ASCII, so anything else is replaced here
+            last_payload = f"\n{data}\n".encode('ascii', 'replace')
+            last_data = data
         
-        # Send multiple times to ensure delivery
-        for _ in range(2):
-            ser.write(f"{data}\n".encode())
-            ser.flush()
-            time.sleep(0.1)
+        # A single write
+        ser.write(last_payload)
         
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] Sent: {data}")
-        os.system(f'logger -t usb-ip-display "Sent: {data}"')
+        log.info(f"Sent: {data}")
         
         return True
         
     except Exception as e:
         print(f"Send error: {e}")
-        os.system(f'logger -t usb-ip-display "Send error: {e}"')
+        log.error(f"Send error: {e}")
         return False
 
-def handle_device_connection(port):
+def handle_device_connection(port, monitor=None):
     """Handle connection to a specific device"""
     print(f"Connecting to {port}...")
-    os.system(f'logger -t usb-ip-display "Connecting to {port}"')
+    log.info(f"Connecting to {port}")
     
     try:
         # Open serial connection
-        ser = serial.Serial(port, BAUD_RATE, timeout=1)
+        ser = serial.Serial(port, BAUD_RATE, timeout=1, write_timeout=WRITE_TIMEOUT)
         
         # Wait for device to be ready
         time.sleep(INITIAL_DELAY)
@@ -252,12 +421,25 @@ def handle_device_connection(port):
         ser.reset_output_buffer()
         
         print(f"Connected to {port}")
-        os.system(f'logger -t usb-ip-display "Connected successfully"')
+        log.info("Connected successfully")
+        
+        # With address change events the IP is only looked up again when one
+        # arrives, without them it is looked up for every send
+        ip = None
+        drain_refresh_requests()
+        if monitor:
+            # Changes from before the connection are included in this lookup
+            drain_address_events(monitor)
+            ip = get_ip_address()
         
         # Send initial data immediately
-        send_data_to_pico(ser)
+        send_data_to_pico(ser, ip)
         
         last_send_time = time.time()
+        failed_sends = 0
+        wait_on = [ser, refresh_pipe[0]]
+        if monitor:
+            wait_on.append(monitor)
         
         # Main loop - send data periodically
         while running:
@@ -266,22 +448,53 @@ def handle_device_connection(port):
                 
                 # Send data every interval
                 if current_time - last_send_time >= SEND_INTERVAL:
-                    if send_data_to_pico(ser):
+                    if send_data_to_pico(ser, ip):
                         last_send_time = current_time
+                        failed_sends = 0
                     else:
-                        # Send failed, device might be disconnected
+                        # Keep the port open and retry after RETRY_DELAY, only
+                        # reconnecting once sends keep failing
+                        failed_sends += 1
+                        if failed_sends >= MAX_FAILED_SENDS:
+                            break
+                        last_send_time = current_time - SEND_INTERVAL + RETRY_DELAY
+                
+                # Sleep until the next send is due, waking up early for output
+                # from the Pico, a refresh request or an address or route change
+                timeout = max(0, last_send_time + SEND_INTERVAL - time.time())
+                readable, _, _ = select.select(wait_on, [], [], timeout)
+                
+                if ser in readable:
+                    # Discard the Pico's console output so it can't back up. Once
+                    # the device is unplugged the port stays readable, and either
+                    # in_waiting fails with a plain OSError (EIO) or the read
+                    # raises SerialException, which is an OSError too
+                    try:
+                        ser.read(ser.in_waiting or 1)
+                    except OSError as e:
+                        print(f"Device disconnected from {port}: {e}")
                         break
                 
-                # Small sleep to prevent CPU spinning
-                time.sleep(0.5)
+                if refresh_pipe[0] in readable and drain_refresh_requests():
+                    print("Refresh requested")
+                    if monitor:
+                        ip = get_ip_address()
+                    # Always send on the next pass, a refresh may be asked for
+                    # because the Pico lost what it was showing
+                    last_send_time = 0
                 
-                # Check if port still exists
-                if not os.path.exists(port):
-                    print(f"Device disconnected from {port}")
-                    break
+                if monitor in readable and drain_address_events(monitor):
+                    print("IP address or route changed")
+                    ip = get_ip_address()
+                    # Send on the next pass, unless the display would show the
+                    # same thing. The periodic send still goes out regardless,
+                    # the Pico counts down SEND_INTERVAL between them
+                    if get_display_data(ip) != last_data:
+                        last_send_time = 0
                     
             except serial.SerialException as e:
-                print(f"Serial error: {e}")
+                # Also how a disconnect shows up
+                print(f"Device disconnected from {port}: {e}")
                 break
             except Exception as e:
                 print(f"Loop error: {e}")
@@ -295,10 +508,10 @@ def handle_device_connection(port):
             
     except serial.SerialException as e:
         print(f"Failed to connect to {port}: {e}")
-        os.system(f'logger -t usb-ip-display "Connection failed: {e}"')
+        log.error(f"Connection failed: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
-        os.system(f'logger -t usb-ip-display "Unexpected error: {e}"')
+        log.error(f"Unexpected error: {e}")
 
 def main():
     """Main function - handles device connections and reconnections"""
@@ -306,7 +519,12 @@ def main():
     print("Press Ctrl+C to stop")
     print("-" * 40)
     
-    os.system('logger -t usb-ip-display "Starting robust sender"')
+    setup_logging()
+    log.info("Starting robust sender")
+    
+    # Resend as soon as the IP address or default route changes, not just
+    # every SEND_INTERVAL
+    monitor = open_address_monitor()
     
     while running:
         try:
@@ -316,22 +534,22 @@ def main():
                 break
             
             # Handle the connection
-            handle_device_connection(port)
+            handle_device_connection(port, monitor)
             
             if running:
                 print("Device disconnected, waiting for reconnection...")
-                os.system('logger -t usb-ip-display "Device disconnected, waiting..."')
+                log.info("Device disconnected, waiting...")
                 time.sleep(RETRY_DELAY)
             
         except KeyboardInterrupt:
             break
         except Exception as e:
             print(f"Main loop error: {e}")
-            os.system(f'logger -t usb-ip-display "Main error: {e}"')
+            log.error(f"Main error: {e}")
             time.sleep(RETRY_DELAY)
     
     print("Shutdown complete")
-    os.system('logger -t usb-ip-display "Shutdown complete"')
+    log.info("Shutdown complete")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == '--test':
@@ -342,6 +560,7 @@ if __name__ == "__main__":
     else:
         main()
 PYTHON_SCRIPT_EOF
+fi
 
 chmod +x /usr/local/bin/usb_ip_sender.py
 print_msg "✓ Script installed to /usr/local/bin/usb_ip_sender.py" "$GREEN"
@@ -357,6 +576,7 @@ After=multi-user.target
 [Service]
 Type=simple
 ExecStart=${PYTHON_PATH} /usr/local/bin/usb_ip_sender.py
+ExecReload=/bin/kill -HUP \$MAINPID
 Restart=always
 RestartSec=5
 StandardOutput=journal
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Copy usb_ip_sender.py into the script embedded in install.sh
+
+install.sh is run as 'curl | sudo bash', so it carries its own copy of the
+sender. Run this after changing usb_ip_sender.py, or with --check to fail
+when the copy is out of date.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SENDER = os.path.join(ROOT, 'usb_ip_sender.py')
+INSTALLER = os.path.join(ROOT, 'install.sh')
+
+START = "cat > /usr/local/bin/usb_ip_sender.py << 'PYTHON_SCRIPT_EOF'\n"
+END = "PYTHON_SCRIPT_EOF\n"
+
+def embedded_script(installer):
+    """Return where the embedded copy starts and ends in install.sh"""
+    start = installer.index(START) + len(START)
+    end = installer.index("\n" + END, start) + 1
+    return start, end
+
+def main():
+    with open(SENDER, newline='') as f:
+        # Shell scripts need LF line endings
+        sender = f.read().replace('\r\n', '\n')
+    if not sender.endswith('\n'):
+        sender += '\n'
+
+    with open(INSTALLER, newline='') as f:
+        installer = f.read()
+    start, end = embedded_script(installer)
+
+    if installer[start:end] == sender:
+        print("install.sh is up to date")
+        return 0
+
+    if '--check' in sys.argv:
+        print("install.sh is out of date, run python3 update_installer.py")
+        return 1
+
+    with open(INSTALLER, 'w', newline='') as f:
+        f.write(installer[:start] + sender + installer[end:])
+    print("Updated install.sh")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())